@@ -0,0 +1,75 @@
+"""
+Microbenchmark of committing every url of a large job one by one, against through the CommitBuffer.
+
+Both run at INFO, the level the service runs at, and at WARNING, which leaves out the per-commit log line.
+Log records are written to the null device, so the terminal does not dominate the timings.
+
+The one-by-one side calls the current JobRecords.commit, which goes through the same commit_batch path
+with a batch of one, not the code from before the CommitBuffer.
+
+    python bench_commit.py [number of urls]
+"""
+import asyncio
+import logging
+import os
+import sys
+import timeit
+from logging import INFO, WARNING
+
+from record import JobRecords
+from commit_buffer import CommitBuffer
+
+
+def _set_log_level(level: int, stream):
+    logger = logging.getLogger('record')
+    logger.setLevel(level)
+    for handler in logger.handlers:
+        handler.setLevel(level)
+        handler.setStream(stream)
+
+
+def _urls(count: int):
+    return ['http://example.com/{}.jpg'.format(i) for i in range(count)]
+
+
+def bench_commit_each(count: int) -> float:
+    jobs = JobRecords()
+    urls = _urls(count)
+    job_id = jobs.create_job(urls)
+
+    def run():
+        for url in urls:
+            jobs.commit(job_id, url, url + '/uploaded')
+
+    return timeit.timeit(run, number=1)
+
+
+def bench_commit_buffered(count: int) -> float:
+    jobs = JobRecords()
+    urls = _urls(count)
+    job_id = jobs.create_job(urls)
+    loop = asyncio.new_event_loop()
+    buffer = CommitBuffer(jobs, loop)
+
+    def run():
+        for url in urls:
+            buffer.commit(job_id, url, url + '/uploaded')
+        loop.run_until_complete(asyncio.sleep(0))
+
+    try:
+        return timeit.timeit(run, number=1)
+    finally:
+        loop.close()
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print('{} url'.format(count))
+    with open(os.devnull, 'w') as null:
+        for level in (INFO, WARNING):
+            _set_log_level(level, null)
+            each = bench_commit_each(count)
+            buffered = bench_commit_buffered(count)
+            print('{}'.format(logging.getLevelName(level)))
+            print('  commit each:     {:.3f} s'.format(each))
+            print('  commit buffered: {:.3f} s'.format(buffered))
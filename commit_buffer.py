@@ -0,0 +1,68 @@
+import asyncio
+from uuid import UUID
+
+from logger import init_logger
+from record import JobRecords
+
+_logger = init_logger(__name__)
+
+
+class CommitBuffer:
+    """
+    Collects relocation results and commits them to the job records in one batch per job per loop iteration.
+
+    >>> from logging import CRITICAL
+    >>> _ = init_logger('record', CRITICAL)
+    >>> loop = asyncio.new_event_loop()
+    >>> jobs = JobRecords()
+    >>> job_id = jobs.create_job(['a', 'b'])
+    >>> buffer = CommitBuffer(jobs, loop)
+    >>> buffer.commit(job_id, 'a', 'A')
+    >>> buffer.commit(job_id, 'b')
+    >>> jobs.query_job(job_id).is_finished
+    False
+    >>> loop.run_until_complete(asyncio.sleep(0))
+    >>> jobs.query_job(job_id).is_finished
+    True
+
+    An unknown url costs only itself, the rest of the batch is committed.
+
+    >>> job_id = jobs.create_job(['a', 'b', 'c'])
+    >>> for url in ['a', 'zzz', 'b', 'c']:
+    ...     buffer.commit(job_id, url, url.upper())
+    >>> loop.run_until_complete(asyncio.sleep(0))
+    >>> jobs.query_job(job_id).is_finished
+    True
+    >>> loop.close()
+    """
+    def __init__(self, jobs: JobRecords, loop: asyncio.AbstractEventLoop):
+        self._jobs = jobs
+        self._loop = loop
+        self._pending = {}
+        self._scheduled = False
+
+    def commit(self, job_id: UUID, url_old: str, url_new: str = None):
+        """
+        :param job_id:
+        :param url_old:
+        :param url_new: None for failing the relocation
+        :return:
+        """
+        self._pending.setdefault(job_id, []).append((url_old, url_new))
+        if not self._scheduled:
+            self._loop.call_soon(self.flush)
+            self._scheduled = True
+
+    def flush(self):
+        pending, self._pending = self._pending, {}
+        self._scheduled = False
+        for job_id, relocation in pending.items():
+            try:
+                self._jobs.commit_batch(job_id, relocation)
+            except KeyError as e:
+                _logger.error('Job not found: {}'.format(str(e)))
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
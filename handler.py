@@ -1,10 +1,12 @@
 from asyncio import AbstractEventLoop
+from datetime import timedelta
 from aiohttp import web
 from json.decoder import JSONDecodeError
 import itertools
 
 from logger import init_logger
 from relocator import Relocator
+from record import JobRecords
 from storage_imgur import StorageImgur
 from retriever_impl import RetrieverImpl
 import request_format
@@ -17,11 +19,28 @@ class Handlers:
 
     @classmethod
     async def create(cls, config, loop: AbstractEventLoop):
-        storage = await StorageImgur.create(config, loop)
-        retriever = RetrieverImpl(loop)
-        relocator = Relocator(retriever, storage, loop)
+        store_workers = config.getint('pipeline', 'store_workers', fallback=8)
+        retrieve_workers = config.getint('pipeline', 'retrieve_workers', fallback=8)
+        storage = await StorageImgur.create(config, loop, workers=store_workers)
+        retriever = RetrieverImpl(loop, workers=retrieve_workers)
+        jobs = JobRecords(**cls._retention(config))
+        sweep_interval = config.getfloat('retention', 'sweep_interval', fallback=None)
+        sweep_batch = config.getint('retention', 'sweep_batch', fallback=100)
+        relocator = Relocator(retriever, storage, loop, jobs, sweep_interval, sweep_batch)
         return cls(relocator)
 
+    @staticmethod
+    def _retention(config) -> dict:
+        ttl = config.getfloat('retention', 'ttl', fallback=None)
+        summary_ttl = config.getfloat('retention', 'summary_ttl', fallback=None)
+        return {
+            'ttl': timedelta(seconds=ttl) if ttl is not None else None,
+            'max_finished': config.getint('retention', 'max_finished', fallback=None),
+            'keep_summary': config.getboolean('retention', 'keep_summary', fallback=True),
+            'summary_ttl': timedelta(seconds=summary_ttl) if summary_ttl is not None else None,
+            'max_archived': config.getint('retention', 'max_archived', fallback=None),
+        }
+
     def __init__(self, relocator: Relocator):
         self._relocator = relocator
 
@@ -72,7 +91,7 @@ class Handlers:
             raise web.HTTPBadRequest(reason='Job id malformed: {}'.format(str(e)))
 
         try:
-            job = self._relocator.status.query_job(job_id)
+            job = self._relocator.query_job(job_id)
         except KeyError as e:
             _logger.info(str(e))
             raise web.HTTPNotFound(reason='Job id not found: {}'.format(str(e)))
@@ -82,6 +101,7 @@ class Handlers:
 
     async def _report_uploaded(self, _: web.Request):
         _logger.debug('Got a request')
-        reloc = itertools.chain.from_iterable(job.relocation for job in self._relocator.status.jobs)
-        data = response_format.format_uploaded_list(reloc)
+        reloc = itertools.chain.from_iterable(job.relocation for job in self._relocator.jobs)
+        urls_stored = itertools.chain.from_iterable(summary.urls_stored for summary in self._relocator.archived)
+        data = response_format.format_uploaded_list(reloc, urls_stored)
         return web.json_response(data)
@@ -0,0 +1,101 @@
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Tuple, Union
+import asyncio
+import reprlib
+
+from logger import init_logger
+
+_logger = init_logger(__name__)
+
+_DONE = object()
+
+
+async def _feed(items: Union[Iterable, AsyncIterable], inbox: asyncio.Queue, workers: int):
+    try:
+        if hasattr(items, '__aiter__'):
+            async for item in items:
+                await inbox.put(item)
+        else:
+            for item in items:
+                await inbox.put(item)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        _logger.error('Source failed: {}'.format(repr(e)))
+
+    for _ in range(workers):
+        await inbox.put(_DONE)
+
+
+async def _work(func: Callable[[Any], Awaitable], inbox: asyncio.Queue, outbox: asyncio.Queue):
+    while True:
+        item = await inbox.get()
+        if item is _DONE:
+            break
+
+        try:
+            result = await func(item)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _logger.error('{}: {}'.format(reprlib.repr(item), repr(e)))
+            result = None
+
+        await outbox.put((item, result))
+
+    await outbox.put(_DONE)
+
+
+async def stream_map(func: Callable[[Any], Awaitable], items: Union[Iterable, AsyncIterable], workers: int,
+                     loop: asyncio.AbstractEventLoop = None) -> AsyncIterator[Tuple[Any, Any]]:
+    """
+    Awaits func on each of the items with a fixed number of workers, yielding every item with its result as it is done.
+    Both queues are bounded by the number of workers, so a slow consumer holds back the workers and the source in turn.
+
+    >>> from logging import CRITICAL
+    >>> _ = init_logger(__name__, CRITICAL)
+    >>> async def double(x):
+    ...     await asyncio.sleep(0)
+    ...     return 2 * x
+    >>> async def increment_result(pair):
+    ...     return pair[1] + 1
+    >>> async def fail(x):
+    ...     raise ValueError(x)
+    >>> async def collect(stream):
+    ...     return sorted([entry async for entry in stream])
+
+    >>> loop = asyncio.new_event_loop()
+    >>> loop.run_until_complete(collect(stream_map(double, range(5), 2, loop)))
+    [(0, 0), (1, 2), (2, 4), (3, 6), (4, 8)]
+    >>> loop.run_until_complete(collect(stream_map(increment_result, stream_map(double, [1, 2], 1, loop), 2, loop)))
+    [((1, 2), 3), ((2, 4), 5)]
+    >>> loop.run_until_complete(collect(stream_map(fail, [1], 1, loop)))
+    [(1, None)]
+    >>> loop.close()
+
+    :param func:
+    :param items: either a plain or an async iterable
+    :param workers: how many items are awaited at the same time
+    :param loop:
+    :return: pairs of item and result, None for a result that raised
+    """
+    inbox = asyncio.Queue(workers)
+    outbox = asyncio.Queue(workers)
+    tasks = [asyncio.ensure_future(_feed(items, inbox, workers), loop=loop)]
+    tasks.extend(asyncio.ensure_future(_work(func, inbox, outbox), loop=loop) for _ in range(workers))
+
+    try:
+        running = workers
+        while running:
+            entry = await outbox.get()
+            if entry is _DONE:
+                running -= 1
+            else:
+                yield entry
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -1,5 +1,6 @@
-from typing import Iterable
-from datetime import datetime
+from typing import Iterable, Union, Tuple, Optional
+from datetime import datetime, timedelta
+from collections import OrderedDict
 import uuid
 import copy
 
@@ -100,10 +101,36 @@ class JobRecord:
     >>> job.update_time
     12
 
+    >>> job.commit_batch(13, [('abc', 'ABC'), ('def', 'DEF')])
+    2
+    >>> job.update_time
+    13
+
+    >>> from logging import CRITICAL
+    >>> _ = init_logger(__name__, CRITICAL)
+    >>> job.commit_batch(14, [('abc', 'ABC'), ('xyz', 'XYZ'), ('def', 'DEF')])
+    2
+    >>> job.update_time
+    14
+    >>> job.commit(15, 'xyz')
+    Traceback (most recent call last):
+    ...
+    KeyError: 'xyz'
+    >>> job.update_time
+    14
+
     >>> job.id
     0
     >>> job.create_time
     10
+    >>> job.is_finished
+    True
+
+    >>> summary = job.summarize()
+    >>> summary.urls_stored
+    ('ABC', 'DEF')
+    >>> summary.update_time
+    14
     """
 
     def __init__(self, job_id, create_time, urls: Iterable[str]):
@@ -116,6 +143,7 @@ class JobRecord:
         self._create_time = create_time
         self._update_time = create_time
         self._relocation = dict((url, RelocationRecord(url)) for url in urls)
+        self._pending = len(self._relocation)
 
     @property
     def id(self):
@@ -129,6 +157,10 @@ class JobRecord:
     def update_time(self):
         return self._update_time
 
+    @property
+    def is_finished(self) -> bool:
+        return not self._pending
+
     @property
     def relocation(self) -> Iterable[RelocationRecord]:
         return (copy.deepcopy(reloc) for reloc in self._relocation.values())
@@ -140,8 +172,103 @@ class JobRecord:
         :param url_new: None for failing the relocation
         :return:
         """
-        self._relocation[url_old].commit(time, url_new)
-        self._update_time = max(time, self._update_time)
+        if url_old not in self._relocation:
+            raise KeyError(url_old)
+        self.commit_batch(time, [(url_old, url_new)])
+
+    def commit_batch(self, time, relocation: Iterable[Tuple[str, Optional[str]]]) -> int:
+        """
+        Unknown urls are logged and skipped, the rest of the batch is still committed.
+
+        :param time: shared by every relocation in the batch
+        :param relocation: pairs of url_old and url_new, None for failing the relocation
+        :return: the number of relocations committed
+        """
+        count = 0
+        for url_old, url_new in relocation:
+            reloc = self._relocation.get(url_old)
+            if reloc is None:
+                _logger.error('Url not found in job: {}, {}'.format(str(self._id), url_old))
+                continue
+
+            was_pending = reloc.is_pending
+            reloc.commit(time, url_new)
+            if was_pending and not reloc.is_pending:
+                self._pending -= 1
+            count += 1
+        if count:
+            self._update_time = max(time, self._update_time)
+        return count
+
+    def summarize(self) -> 'JobSummary':
+        return JobSummary(self._id, self._create_time, self._update_time,
+                          [reloc.url_new for reloc in self._relocation.values() if reloc.is_stored],
+                          [reloc.url_old for reloc in self._relocation.values() if reloc.is_failed])
+
+
+class JobSummary:
+    """
+    The compact, immutable remains of a finished job once it has been evicted from the full records.
+
+    >>> summary = JobSummary(0, 10, 12, ['A'], ['b', 'c'])
+    >>> summary.id
+    0
+    >>> summary.create_time
+    10
+    >>> summary.update_time
+    12
+    >>> summary.urls_stored
+    ('A',)
+    >>> summary.urls_failed
+    ('b', 'c')
+    >>> summary.count_stored
+    1
+    >>> summary.count_failed
+    2
+    >>> summary.is_finished
+    True
+    """
+
+    __slots__ = ('_id', '_create_time', '_update_time', '_urls_stored', '_urls_failed')
+
+    def __init__(self, job_id, create_time, update_time, urls_stored: Iterable[str], urls_failed: Iterable[str]):
+        self._id = job_id
+        self._create_time = create_time
+        self._update_time = update_time
+        self._urls_stored = tuple(urls_stored)
+        self._urls_failed = tuple(urls_failed)
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def create_time(self):
+        return self._create_time
+
+    @property
+    def update_time(self):
+        return self._update_time
+
+    @property
+    def urls_stored(self) -> Iterable[str]:
+        return self._urls_stored
+
+    @property
+    def urls_failed(self) -> Iterable[str]:
+        return self._urls_failed
+
+    @property
+    def count_stored(self) -> int:
+        return len(self._urls_stored)
+
+    @property
+    def count_failed(self) -> int:
+        return len(self._urls_failed)
+
+    @property
+    def is_finished(self) -> bool:
+        return True
 
 
 class JobRecords:
@@ -165,9 +292,78 @@ class JobRecords:
     True
     True
     True
+    >>> jobs.commit_batch(job2, [('c', 'C'), ('d', None), ('e', 'E')])
+    >>> sorted(relc.url_new for relc in jobs.query_job(job2).relocation if relc.is_stored)
+    ['C', 'E']
+    >>> jobs.query_job(job2).is_finished
+    True
+    >>> jobs.commit(job1, 'zzz', 'Z')
+    Traceback (most recent call last):
+    ...
+    KeyError: 'zzz'
+
+    Finished jobs beyond the retention limits are collapsed into a JobSummary, or dropped.
+
+    >>> jobs = JobRecords(max_finished=1)
+    >>> job1 = jobs.create_job(['a'])
+    >>> job2 = jobs.create_job(['b'])
+    >>> jobs.commit(job1, 'a', 'A')
+    >>> jobs.commit(job2, 'b')
+    >>> jobs.sweep(datetime.utcnow())
+    1
+    >>> jobs.query_job(job1).urls_stored
+    ('A',)
+    >>> jobs.query_job(job2).is_finished
+    True
+    >>> [job.id == job2 for job in jobs.jobs]
+    [True]
+    >>> [summary.id == job1 for summary in jobs.archived]
+    [True]
+
+    >>> jobs = JobRecords(ttl=timedelta(seconds=60), keep_summary=False)
+    >>> job1 = jobs.create_job(['a'])
+    >>> job2 = jobs.create_job(['b'])
+    >>> jobs.commit(job1, 'a', 'A')
+    >>> jobs.sweep(datetime.utcnow())
+    0
+    >>> jobs.sweep(datetime.utcnow() + timedelta(seconds=61))
+    1
+    >>> jobs.query_job(job1) # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    ...
+    KeyError: ...
+    >>> jobs.query_job(job2).is_finished
+    False
+
+    Summaries have retention limits of their own.
+
+    >>> jobs = JobRecords(max_finished=0, max_archived=1)
+    >>> job1 = jobs.create_job(['a'])
+    >>> job2 = jobs.create_job(['b'])
+    >>> jobs.commit(job1, 'a', 'A')
+    >>> jobs.commit(job2, 'b', 'B')
+    >>> jobs.sweep(datetime.utcnow())
+    3
+    >>> [summary.id == job2 for summary in jobs.archived]
+    [True]
     """
-    def __init__(self):
+    def __init__(self, ttl: timedelta = None, max_finished: int = None, keep_summary: bool = True,
+                 summary_ttl: timedelta = None, max_archived: int = None):
+        """
+        :param ttl: how long a finished job is kept in full after its last commit, None for no limit
+        :param max_finished: how many finished jobs are kept in full, None for no limit
+        :param keep_summary: whether evicted jobs are kept as a JobSummary or dropped altogether
+        :param summary_ttl: how long a JobSummary is kept after the last commit of its job, None for no limit
+        :param max_archived: how many JobSummary are kept, None for no limit
+        """
+        self._ttl = ttl
+        self._max_finished = max_finished
+        self._keep_summary = keep_summary
+        self._summary_ttl = summary_ttl
+        self._max_archived = max_archived
         self._jobs = {}
+        self._finished = OrderedDict()
+        self._archive = OrderedDict()
 
     def create_job(self, urls: Iterable[str]) -> uuid.UUID:
         """
@@ -177,6 +373,8 @@ class JobRecords:
         job_id = uuid.uuid4()
         job = JobRecord(job_id, datetime.utcnow(), urls)
         self._jobs[job_id] = job
+        if job.is_finished:
+            self._finished[job_id] = None
         _logger.info('Created job: {}'.format(str(job_id)))
         return job_id
 
@@ -187,16 +385,92 @@ class JobRecords:
         :param url_new: None for failing the relocation
         :return:
         """
-        self._jobs[job_id].commit(datetime.utcnow(), url_old, url_new)
+        job = self._jobs[job_id]
+        job.commit(datetime.utcnow(), url_old, url_new)
+        self._track_finished(job)
         _logger.info('Committed job: {}, {} -> {}'.format(str(job_id), url_old, url_new))
 
-    def query_job(self, job_id: uuid.UUID) -> JobRecord:
+    def commit_batch(self, job_id: uuid.UUID, relocation: Iterable[Tuple[str, Optional[str]]]):
+        """
+        Commits many relocations of one job at once, with a single timestamp and log line.
+        Unlike commit, unknown urls are logged and skipped.
+
+        :param job_id:
+        :param relocation: pairs of url_old and url_new, None for failing the relocation
+        :return:
+        """
+        job = self._jobs[job_id]
+        count = job.commit_batch(datetime.utcnow(), relocation)
+        self._track_finished(job)
+        if count:
+            _logger.info('Committed job: {}, {} url'.format(str(job_id), count))
+
+    def _track_finished(self, job: JobRecord):
+        if job.is_finished:
+            # kept in order of the last commit, so the sweep only ever looks at the front
+            self._finished[job.id] = None
+            self._finished.move_to_end(job.id)
+
+    def sweep(self, now: datetime, limit: int = None) -> int:
+        """
+        Evicts finished jobs, then summaries, that are expired or beyond the count limit, oldest first.
+
+        :param now:
+        :param limit: the most jobs and summaries to evict in this call, None for no limit
+        :return: the number of jobs and summaries evicted
+        """
+        evicted = self._sweep_finished(now, limit)
+        evicted += self._sweep_archive(now, None if limit is None else limit - evicted)
+
+        if evicted:
+            _logger.info('Evicted {} finished job(s) or summaries'.format(evicted))
+        return evicted
+
+    def _sweep_finished(self, now: datetime, limit: Optional[int]) -> int:
+        evicted = 0
+        while self._finished and (limit is None or evicted < limit):
+            job_id = next(iter(self._finished))
+            job = self._jobs[job_id]
+            over_count = self._max_finished is not None and len(self._finished) > self._max_finished
+            expired = self._ttl is not None and now - job.update_time > self._ttl
+            if not (over_count or expired):
+                break
+
+            del self._finished[job_id]
+            del self._jobs[job_id]
+            if self._keep_summary:
+                self._archive[job_id] = job.summarize()
+            evicted += 1
+
+        return evicted
+
+    def _sweep_archive(self, now: datetime, limit: Optional[int]) -> int:
+        evicted = 0
+        while self._archive and (limit is None or evicted < limit):
+            job_id, summary = next(iter(self._archive.items()))
+            over_count = self._max_archived is not None and len(self._archive) > self._max_archived
+            expired = self._summary_ttl is not None and now - summary.update_time > self._summary_ttl
+            if not (over_count or expired):
+                break
+
+            del self._archive[job_id]
+            evicted += 1
+
+        return evicted
+
+    def query_job(self, job_id: uuid.UUID) -> Union[JobRecord, JobSummary]:
+        if job_id in self._archive:
+            return self._archive[job_id]
         return copy.deepcopy(self._jobs[job_id])
 
     @property
     def jobs(self) -> Iterable[JobRecord]:
         return (copy.deepcopy(job) for job in self._jobs.values())
 
+    @property
+    def archived(self) -> Iterable[JobSummary]:
+        return iter(self._archive.values())
+
 
 if __name__ == "__main__":
     import doctest
@@ -1,10 +1,11 @@
 import asyncio
+from datetime import datetime
 from uuid import UUID
-from typing import Iterable
-import copy
+from typing import Iterable, Union
 
 from logger import init_logger
-from record import JobRecords
+from record import JobRecords, JobRecord, JobSummary
+from commit_buffer import CommitBuffer
 from storage import Storage
 from retriever import Retriever
 
@@ -29,43 +30,95 @@ class Relocator:
     >>> run_until_all_complete(loop) # doctest: +ELLIPSIS
     Retrieving: url...
     Retrieving: url...
-    >>> run_until_all_complete(loop) # doctest: +ELLIPSIS
     Stored: url.../uploaded
     Stored: url.../uploaded
     >>> loop.close()
-    >>> for job in relocator.status.jobs:
+    >>> for job in relocator.jobs:
     ...     for reloc in job.relocation:
     ...         print(reloc.url_new) # doctest: +ELLIPSIS
     url.../uploaded
     url.../uploaded
+
+    >>> Relocator(RetrieverStub(loop), StorageStub(loop), loop, sweep_interval=60, sweep_batch=0)
+    Traceback (most recent call last):
+    ...
+    ValueError: sweep_batch should be positive: 0
+
+    The sweep carries on at once while it evicts full batches, then waits for the next interval.
+
+    >>> _ = init_logger('record', CRITICAL)
+    >>> loop = asyncio.new_event_loop()
+    >>> jobs = JobRecords(max_finished=0)
+    >>> for url in ('url1', 'url2', 'url3'):
+    ...     jobs.commit(jobs.create_job([url]), url, url + '/uploaded')
+    >>> relocator = Relocator(RetrieverStub(loop), StorageStub(loop), loop, jobs, sweep_interval=0.1, sweep_batch=1)
+    >>> loop.run_until_complete(asyncio.sleep(0.15))
+    >>> sorted(summary.urls_stored[0] for summary in relocator.archived)
+    ['url1/uploaded', 'url2/uploaded', 'url3/uploaded']
+    >>> jobs.commit(jobs.create_job(['url4']), 'url4', 'url4/uploaded')
+    >>> len(list(relocator.jobs))
+    1
+    >>> loop.run_until_complete(asyncio.sleep(0.1))
+    >>> len(list(relocator.jobs)), len(list(relocator.archived))
+    (0, 4)
+    >>> loop.close()
     """
-    def __init__(self, retriever: Retriever, storage: Storage, loop: asyncio.AbstractEventLoop):
+    def __init__(self, retriever: Retriever, storage: Storage, loop: asyncio.AbstractEventLoop,
+                 jobs: JobRecords = None, sweep_interval: float = None, sweep_batch: int = 100):
+        """
+        :param retriever:
+        :param storage:
+        :param loop:
+        :param jobs: None for records without retention limits
+        :param sweep_interval: seconds between sweeps of finished jobs, None for never sweeping
+        :param sweep_batch: the most jobs and summaries evicted per loop iteration, so that a sweep never stalls the loop,
+                            None for no limit
+        """
+        if sweep_interval is not None and sweep_interval <= 0:
+            raise ValueError('sweep_interval should be positive: {}'.format(sweep_interval))
+        if sweep_batch is not None and sweep_batch <= 0:
+            raise ValueError('sweep_batch should be positive: {}'.format(sweep_batch))
+
         self._storage = storage
         self._retriever = retriever
-        self._jobs = JobRecords()
+        self._jobs = jobs if jobs is not None else JobRecords()
         self._loop = loop
+        self._commits = CommitBuffer(self._jobs, loop)
+        self._sweep_interval = sweep_interval
+        self._sweep_batch = sweep_batch
+        if self._sweep_interval is not None:
+            self._loop.call_later(self._sweep_interval, self._sweep)
+
+    def _sweep(self):
+        evicted = self._jobs.sweep(datetime.utcnow(), self._sweep_batch)
+        if self._sweep_batch is not None and evicted >= self._sweep_batch:
+            # more may be due, carry on right after whatever else is ready to run
+            self._loop.call_soon(self._sweep)
+        else:
+            self._loop.call_later(self._sweep_interval, self._sweep)
 
     def start(self, urls: Iterable[str]) -> UUID:
         urls_unique = set(urls)
         job_id = self._jobs.create_job(urls_unique)
-        batch = self._retriever.retrieve_batch(urls_unique, lambda url, content: self._on_retrieved(job_id, url, content))
-        asyncio.ensure_future(batch, loop=self._loop)
-        _logger.debug('Started retriever for {}, {} url'.format(str(job_id), len(urls_unique)))
+        asyncio.ensure_future(self._relocate(job_id, urls_unique), loop=self._loop)
+        _logger.debug('Started relocation for {}, {} url'.format(str(job_id), len(urls_unique)))
         return job_id
 
-    def _on_retrieved(self, job_id, url: str, content: bytes):
-        if not content:
-            _logger.debug('Retrieved nothing: {}, {}'.format(str(job_id), url))
-            self._jobs.commit(job_id, url, None)
-        else:
-            _logger.debug('Retrieved {} bytes: {}, {}'.format(len(content), str(job_id), url))
-            batch = self._storage.store_batch([content], lambda _, url_new: self._jobs.commit(job_id, url, url_new))
-            asyncio.ensure_future(batch, loop=self._loop)
-            _logger.debug('Started storage')
+    async def _relocate(self, job_id, urls: Iterable[str]):
+        async for url, url_new in self._storage.stream(self._retriever.stream(urls)):
+            _logger.debug('Relocated: {}, {} -> {}'.format(str(job_id), url, url_new))
+            self._commits.commit(job_id, url, url_new)
+
+    def query_job(self, job_id: UUID) -> Union[JobRecord, JobSummary]:
+        return self._jobs.query_job(job_id)
+
+    @property
+    def jobs(self) -> Iterable[JobRecord]:
+        return self._jobs.jobs
 
     @property
-    def status(self) -> JobRecords:
-        return copy.deepcopy(self._jobs)
+    def archived(self) -> Iterable[JobSummary]:
+        return self._jobs.archived
 
 
 if __name__ == "__main__":
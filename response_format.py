@@ -1,7 +1,7 @@
-from typing import Iterable
+from typing import Iterable, Union
 from datetime import datetime
 from uuid import UUID
-from record import RelocationRecord, JobRecord
+from record import RelocationRecord, JobRecord, JobSummary
 
 
 def _format_job_id(job_id: UUID) -> str:
@@ -16,7 +16,7 @@ def format_job_id(job_id: UUID) -> dict:
     return {'jobId': _format_job_id(job_id)}
 
 
-def format_job_status(job: JobRecord) -> dict:
+def format_job_status(job: Union[JobRecord, JobSummary]) -> dict:
     """
     >>> import datetime
     >>> job = JobRecord(1, datetime.datetime.utcnow(), ['a', 'b'])
@@ -43,10 +43,19 @@ def format_job_status(job: JobRecord) -> dict:
     >>> job.commit(datetime.datetime.utcnow(), 'b', 'B')
     >>> format_job_status(job) # doctest: +ELLIPSIS
     {'id': '1', 'created': '2...', 'finished': '2...', 'status': 'complete', 'uploaded': {'pending': [], 'complete': ['A', 'B'], 'failed': []}}
+
+    >>> job.commit(datetime.datetime.utcnow(), 'b')
+    >>> format_job_status(job.summarize()) # doctest: +ELLIPSIS
+    {'id': '1', 'created': '2...', 'finished': '2...', 'status': 'complete', 'uploaded': {'pending': [], 'complete': ['A'], 'failed': ['b']}}
     """
-    pending = [reloc.url_old for reloc in filter(lambda r: r.is_pending, job.relocation)]
-    failed = [reloc.url_old for reloc in filter(lambda r: r.is_failed, job.relocation)]
-    complete = [reloc.url_new for reloc in filter(lambda r: r.is_stored, job.relocation)]
+    if isinstance(job, JobSummary):
+        pending = []
+        failed = list(job.urls_failed)
+        complete = list(job.urls_stored)
+    else:
+        pending = [reloc.url_old for reloc in filter(lambda r: r.is_pending, job.relocation)]
+        failed = [reloc.url_old for reloc in filter(lambda r: r.is_failed, job.relocation)]
+        complete = [reloc.url_new for reloc in filter(lambda r: r.is_stored, job.relocation)]
 
     if not pending:
         finished_time = _format_time(job.update_time)
@@ -73,7 +82,7 @@ def format_job_status(job: JobRecord) -> dict:
     return status
 
 
-def format_uploaded_list(relocation: Iterable[RelocationRecord]) -> dict:
+def format_uploaded_list(relocation: Iterable[RelocationRecord], urls_stored: Iterable[str] = ()) -> dict:
     """
     >>> reolc = RelocationRecord('a')
     >>> reolc.commit(0)
@@ -83,6 +92,9 @@ def format_uploaded_list(relocation: Iterable[RelocationRecord]) -> dict:
     >>> reolc.commit(1, 'A')
     >>> format_uploaded_list([reolc])
     {'uploaded': ['A']}
+
+    >>> format_uploaded_list([reolc], ['B'])
+    {'uploaded': ['A', 'B']}
     """
     uploaded = {
         "uploaded": []
@@ -91,6 +103,8 @@ def format_uploaded_list(relocation: Iterable[RelocationRecord]) -> dict:
     for reloc in filter(lambda r: r.is_stored, relocation):
         uploaded['uploaded'].append(reloc.url_new)
 
+    uploaded['uploaded'].extend(urls_stored)
+
     return uploaded
 
 
@@ -1,26 +1,75 @@
 from abc import ABC, abstractmethod
-from typing import Iterable, Callable
+from typing import Iterable, AsyncIterator, Tuple, Optional, Sized
 import asyncio
 
 from logger import init_logger
+from pipeline import stream_map
 
 _logger = init_logger(__name__)
 
 
 class Retriever(ABC):
+    """
+    The workers limit is shared by every stream of the same retriever.
+
+    >>> class CountingRetriever(Retriever):
+    ...     in_flight, most = 0, 0
+    ...     async def _retrieve(self, url):
+    ...         CountingRetriever.in_flight += 1
+    ...         CountingRetriever.most = max(CountingRetriever.most, CountingRetriever.in_flight)
+    ...         await asyncio.sleep(0.01)
+    ...         CountingRetriever.in_flight -= 1
+    ...         return url.encode()
+    >>> async def drain(stream):
+    ...     return len([entry async for entry in stream])
+    >>> async def drain_all(streams):
+    ...     return await asyncio.gather(*(drain(stream) for stream in streams))
+
+    >>> loop = asyncio.new_event_loop()
+    >>> retriever = CountingRetriever(loop, workers=2)
+    >>> loop.run_until_complete(drain_all([retriever.stream(['a', 'b', 'c']) for _ in range(3)]))
+    [3, 3, 3]
+    >>> CountingRetriever.most
+    2
+    >>> loop.close()
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop = None, workers: int = 8):
+        """
+        :param loop:
+        :param workers: how many urls are retrieved at the same time, across all streams
+        """
+        if workers <= 0:
+            raise ValueError('workers should be positive: {}'.format(workers))
 
-    def __init__(self, loop: asyncio.AbstractEventLoop = None):
         self._loop = loop
+        self._workers = workers
+        self._slots = None
 
     @abstractmethod
     async def _retrieve(self, url: str) -> bytes:
         pass
 
-    async def _retrieve_each(self, url: str, on_each_complete: Callable[[str, bytes], None]):
-        content = await self._retrieve(url)
+    async def _retrieve_each(self, url: str) -> Optional[bytes]:
+        if self._slots is None:
+            # created on first use, so that it belongs to the running loop
+            self._slots = asyncio.Semaphore(self._workers)
+
+        async with self._slots:
+            content = await self._retrieve(url)
         _logger.debug(url)
-        on_each_complete(url, content)
+        return content
+
+    async def stream(self, urls: Iterable[str]) -> AsyncIterator[Tuple[str, Optional[bytes]]]:
+        """
+        :param urls:
+        :return: pairs of url and content, None for failing the retrieval
+        """
+        workers = max(1, min(self._workers, len(urls))) if isinstance(urls, Sized) else self._workers
+        async for url, content in stream_map(self._retrieve_each, urls, workers, self._loop):
+            yield url, content
+
 
-    async def retrieve_batch(self, urls: Iterable[str], on_each_complete: Callable[[str, bytes], None]):
-        batch = (self._retrieve_each(url, on_each_complete) for url in urls)
-        await asyncio.gather(*batch, loop=self._loop, return_exceptions=True)
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -16,19 +16,21 @@ class RetrieverImpl(Retriever):
     >>> URL = 'http://example.com'
     >>> loop = asyncio.get_event_loop()
     >>> retriever = RetrieverImpl(loop)
-    >>> cb = lambda url, content: print(url, content)
-    >>> loop.run_until_complete(retriever.retrieve_batch([URL] * 2, cb)) # doctest: +ELLIPSIS
+    >>> async def print_stream(urls):
+    ...     async for url, content in retriever.stream(urls):
+    ...         print(url, content)
+    >>> loop.run_until_complete(print_stream([URL] * 2)) # doctest: +ELLIPSIS
     http://example.com b'...Example Domain...'
     http://example.com b'...Example Domain...'
-    >>> loop.run_until_complete(retriever.retrieve_batch(['http://'], cb))
+    >>> loop.run_until_complete(print_stream(['http://']))
     http:// None
-    >>> loop.run_until_complete(retriever.retrieve_batch(['h'], cb))
+    >>> loop.run_until_complete(print_stream(['h']))
     h None
     >>> loop.close()
     """
-    def __init__(self, loop: AbstractEventLoop, executor: Executor = None):
+    def __init__(self, loop: AbstractEventLoop, executor: Executor = None, workers: int = 8):
         self._executor = executor
-        super().__init__(loop)
+        super().__init__(loop, workers)
 
     async def _retrieve(self, url):
         try:
@@ -1,26 +1,53 @@
 from abc import ABC, abstractmethod
-from typing import Iterable, Callable
+from typing import Any, AsyncIterable, AsyncIterator, Tuple, Optional
 import asyncio
 
 from logger import init_logger
+from pipeline import stream_map
 
 _logger = init_logger(__name__)
 
 
 class Storage(ABC):
 
-    def __init__(self, loop: asyncio.AbstractEventLoop = None):
+    def __init__(self, loop: asyncio.AbstractEventLoop = None, workers: int = 8):
+        """
+        :param loop:
+        :param workers: how many contents are stored at the same time, across all streams
+        """
+        if workers <= 0:
+            raise ValueError('workers should be positive: {}'.format(workers))
+
         self._loop = loop
+        self._workers = workers
+        self._slots = None
 
     @abstractmethod
     async def _store(self, content: bytes) -> str:
         pass
 
-    async def _store_each(self, content: bytes, on_each_complete: Callable[[bytes, str], None]):
-        url = await self._store(content)
+    async def _store_each(self, entry: Tuple[Any, Optional[bytes]]) -> Optional[str]:
+        key, content = entry
+        if not content:
+            return None
+
+        if self._slots is None:
+            # created on first use, so that it belongs to the running loop
+            self._slots = asyncio.Semaphore(self._workers)
+
+        async with self._slots:
+            try:
+                url = await self._store(content)
+            except Exception as e:
+                _logger.error('{}: {}'.format(key, repr(e)))
+                return None
         _logger.debug(url)
-        on_each_complete(content, url)
-
-    async def store_batch(self, contents: Iterable[bytes], on_each_complete: Callable[[bytes, str], None]):
-        batch = (self._store_each(content, on_each_complete) for content in contents)
-        await asyncio.gather(*batch, loop=self._loop, return_exceptions=True)
+        return url
+
+    async def stream(self, entries: AsyncIterable[Tuple[Any, Optional[bytes]]]) -> AsyncIterator[Tuple[Any, Optional[str]]]:
+        """
+        :param entries: pairs of key and content, e.g. straight from Retriever.stream
+        :return: pairs of key and url, None for failing the storage
+        """
+        async for (key, _), url in stream_map(self._store_each, entries, self._workers, self._loop):
+            yield key, url
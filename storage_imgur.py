@@ -26,30 +26,35 @@ class StorageImgur(Storage):
     >>> import asyncio
     >>> loop = asyncio.get_event_loop()
     >>> storage = loop.run_until_complete(StorageImgur.create(config, loop))
-    >>> cb = lambda _, url_new: print(url_new)
+    >>> async def entries(contents):
+    ...     for content in contents:
+    ...         yield None, content
+    >>> async def print_stream(contents):
+    ...     async for _, url_new in storage.stream(entries(contents)):
+    ...         print(url_new)
 
-    >>> loop.run_until_complete(storage.store_batch([img_output.getvalue()]*2, cb)) # doctest: +ELLIPSIS
+    >>> loop.run_until_complete(print_stream([img_output.getvalue()]*2)) # doctest: +ELLIPSIS
     http...
     http...
-    >>> loop.run_until_complete(storage.store_batch(['abc'.encode()], cb))
+    >>> loop.run_until_complete(print_stream(['abc'.encode()]))
     None
-    >>> loop.run_until_complete(storage.store_batch([None], cb))
+    >>> loop.run_until_complete(print_stream([None]))
     None
     >>> loop.close()
     """
     @classmethod
-    async def create(cls, config, loop: AbstractEventLoop, executor: Executor = None):
+    async def create(cls, config, loop: AbstractEventLoop, executor: Executor = None, workers: int = 8):
         client_id = config.get('credentials_imgur', 'client_id')
         client_secret = config.get('credentials_imgur', 'client_secret')
 
         client = await loop.run_in_executor(executor, ImgurClient, client_id, client_secret)
 
-        return cls(client, loop, executor)
+        return cls(client, loop, executor, workers)
 
-    def __init__(self, client, loop, executor):
+    def __init__(self, client, loop, executor, workers: int = 8):
         self._client = client
         self._executor = executor
-        super().__init__(loop)
+        super().__init__(loop, workers)
 
     async def _store(self, content):
         try: